@@ -1,4 +1,6 @@
-from typing import Type, Union, Any
+import io
+import struct
+from typing import Type, Union, Any, Optional, Dict, Tuple, Callable
 
 UNDEFINED = None
 PY_INT = int
@@ -19,33 +21,61 @@ def checkSubclass(x, subclass):
         raise TypeError(f"Expected {subclass} but got {type(x)}")
 
 
-class Buffer:
+STRUCT_FORMATS = {8: "b", 16: "h", 32: "i", 64: "q"}
+
+
+def intStruct(bits, signed) -> Optional[struct.Struct]:
+    fmt = STRUCT_FORMATS.get(bits)
+    if fmt is None:
+        return None
+    return struct.Struct(">" + (fmt if signed else fmt.upper()))
+
+
+class ReadBuffer:
     def __init__(self, value) -> None:
-        self.buffer = value
+        self._mv = memoryview(value).cast("B")
+        self._pos = 0
 
     def read(self, n):
-        v = self.buffer[:n]
-        self.buffer = self.buffer[n:]
+        v = self._mv[self._pos : self._pos + n]
+        self._pos += len(v)
         return v
 
     def readAll(self):
-        v = self.buffer
-        self.buffer = self.buffer[0:0]
+        v = self._mv[self._pos :]
+        self._pos = len(self._mv)
         return v
 
     def peek(self, n):
-        return self.buffer[:n]
-
-    def write(self, v):
-        self.buffer += v
+        return self._mv[self._pos : self._pos + n]
 
     def get_empty(self):
-        return len(self.buffer) == 0
+        return self.get_length() == 0
 
     empty = property(get_empty, lambda x, y: None, lambda x: None)
 
     def get_length(self):
-        return len(self.buffer)
+        return len(self._mv) - self._pos
+
+    length = property(get_length, lambda x, y: None, lambda x: None)
+
+
+Buffer = ReadBuffer
+
+
+class WriteBuffer:
+    write: Callable[[Any], PY_INT]
+
+    def __init__(self) -> None:
+        self._bio = io.BytesIO()
+        # Bind the C-level write directly so callers skip a Python frame
+        self.write = self._bio.write
+
+    def getvalue(self):
+        return self._bio.getvalue()
+
+    def get_length(self):
+        return self._bio.tell()
 
     length = property(get_length, lambda x, y: None, lambda x: None)
 
@@ -63,6 +93,10 @@ class DataType:
     def toBytes(cls, x) -> PY_BYTES:
         raise NotImplementedError()
 
+    @classmethod
+    def writeBytes(cls, x, out: WriteBuffer) -> None:
+        out.write(cls.toBytes(x))
+
     @classmethod
     def fromBytes(cls, x) -> Any:
         raise NotImplementedError()
@@ -75,56 +109,84 @@ class DataType:
 class Int(DataType):
     BITS: PY_INT = 0
     SIGNED: bool = False
+    BYTES: PY_INT = 0
+    _MIN: PY_INT = 0
+    _MAX: PY_INT = 1
+    _STRUCT: Optional[struct.Struct] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.BYTES = cls.BITS // 8
+        if cls.SIGNED:
+            cls._MIN = -(1 << (cls.BITS - 1))
+            cls._MAX = 1 << (cls.BITS - 1)
+        else:
+            cls._MIN = 0
+            cls._MAX = 1 << cls.BITS
+        cls._STRUCT = intStruct(cls.BITS, cls.SIGNED)
 
     @classmethod
     def validateValue(cls, x):
         checkInstance(x, PY_INT)
-        if cls.SIGNED:
-            assert x < cls.max() or x > cls.min(), "Signed integer overflow"
-        else:
-
-            assert x >= cls.min(), "Got signed value, but this is unsigned datatype"
-            assert x < cls.max(), "Integer overflow"
+        if not (cls._MIN <= x < cls._MAX):
+            raise ValueError(
+                f"Value {x} out of range [{cls._MIN}, {cls._MAX}) for {cls.__name__}"
+            )
         return True
 
     @classmethod
     def validateBytes(cls, x):
-        checkInstance(x, (PY_BYTES, Buffer))
+        checkInstance(x, (PY_BYTES, ReadBuffer))
 
     @classmethod
     def toBytes(cls, x):
-        cls.validateValue(x)
-        return x.to_bytes(cls.BITS // 8, byteorder="big", signed=cls.SIGNED)
+        if __debug__:
+            cls.validateValue(x)
+        if cls._STRUCT is not None:
+            return cls._STRUCT.pack(x)
+        return x.to_bytes(cls.BYTES, byteorder="big", signed=cls.SIGNED)
+
+    @classmethod
+    def writeBytes(cls, x, out):
+        if cls._STRUCT is None:
+            out.write(cls.toBytes(x))
+            return
+        if __debug__:
+            cls.validateValue(x)
+        out.write(cls._STRUCT.pack(x))
 
     @classmethod
     def fromBytes(cls, x):
-        cls.validateBytes(x)
-        if not isinstance(x, Buffer):
-            x = Buffer(x)
-        return PY_INT.from_bytes(
-            x.read(cls.BITS // 8), byteorder="big", signed=cls.SIGNED
-        )
+        if cls._STRUCT is not None:
+            if not isinstance(x, ReadBuffer):
+                return cls._STRUCT.unpack_from(x)[0]
+            v = cls._STRUCT.unpack_from(x._mv, x._pos)[0]
+            x._pos += cls.BYTES
+            return v
+        if not isinstance(x, ReadBuffer):
+            x = ReadBuffer(x)
+        return PY_INT.from_bytes(x.read(cls.BYTES), byteorder="big", signed=cls.SIGNED)
 
     @classmethod
     def max(cls):
-        if cls.SIGNED:
-            return 2**cls.BITS / 2
-        else:
-            return 2**cls.BITS
+        return cls._MAX
 
     @classmethod
     def min(cls):
-        if cls.SIGNED:
-            return 2**cls.BITS / -2
-        else:
-            return 0
+        return cls._MIN
 
     @staticmethod
     def new(bits, signed):
+        # Reuse one class per width so repeated schemas share the same type
+        cached = INT_CACHE.get((bits, signed))
+        if cached is not None:
+            return cached
+
         class __Int(Int):
             BITS = bits
             SIGNED: bool = signed
 
+        INT_CACHE[(bits, signed)] = __Int
         return __Int
 
 
@@ -140,8 +202,22 @@ class uint32(Int):
     BITS = 32
 
 
+INT_CACHE: Dict[Tuple[PY_INT, bool], Type[Int]] = {
+    (8, False): uint8,
+    (16, False): uint16,
+    (32, False): uint32,
+}
+
+
 class Sequence(DataType):
     LENGTH_DT = uint32
+    _len_to_bytes = staticmethod(uint32.toBytes)
+    _len_from_bytes = staticmethod(uint32.fromBytes)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._len_to_bytes = staticmethod(cls.LENGTH_DT.toBytes)
+        cls._len_from_bytes = staticmethod(cls.LENGTH_DT.fromBytes)
 
     @classmethod
     def validateValue(cls, x):
@@ -149,20 +225,27 @@ class Sequence(DataType):
 
     @classmethod
     def validateBytes(cls, x):
-        checkInstance(x, (PY_BYTES, Buffer))
+        checkInstance(x, (PY_BYTES, ReadBuffer))
 
     @classmethod
     def toBytes(cls, x):
-        cls.validateValue(x)
-        return cls.LENGTH_DT.toBytes(len(x)) + x
+        if __debug__:
+            cls.validateValue(x)
+        return cls._len_to_bytes(len(x)) + x
+
+    @classmethod
+    def writeBytes(cls, x, out):
+        if __debug__:
+            cls.validateValue(x)
+        out.write(cls._len_to_bytes(len(x)))
+        out.write(x)
 
     @classmethod
     def fromBytes(cls, x):
-        cls.validateBytes(x)
-        if not isinstance(x, Buffer):
-            x = Buffer(x)
-        length = cls.LENGTH_DT.fromBytes(x)
-        return x.read(length)
+        if not isinstance(x, ReadBuffer):
+            x = ReadBuffer(x)
+        length = cls._len_from_bytes(x)
+        return x.read(length).tobytes()
 
     @staticmethod
     def new(length_dt):
@@ -175,32 +258,78 @@ class Sequence(DataType):
 class Vector(DataType):
     LENGTH_DT: Type[Int] = uint32
     VALUE_DT: Type[DataType]
+    _len_to_bytes = staticmethod(uint32.toBytes)
+    _len_from_bytes = staticmethod(uint32.fromBytes)
+    # struct format character for vectors of fixed-width Ints, which are
+    # packed and unpacked in bulk with a single struct call
+    _val_format: Optional[PY_STR] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._len_to_bytes = staticmethod(cls.LENGTH_DT.toBytes)
+        cls._len_from_bytes = staticmethod(cls.LENGTH_DT.fromBytes)
+        if hasattr(cls, "VALUE_DT"):
+            cls._val_to_bytes = staticmethod(cls.VALUE_DT.toBytes)
+            cls._val_write_bytes = staticmethod(cls.VALUE_DT.writeBytes)
+            cls._val_from_bytes = staticmethod(cls.VALUE_DT.fromBytes)
+            packer = getattr(cls.VALUE_DT, "_STRUCT", None)
+            cls._val_format = packer.format[1:] if packer is not None else None
 
     @classmethod
     def validateValue(cls, x):
+        # Elements are validated by VALUE_DT.toBytes as they are encoded
         checkInstance(x, list)
-        map(cls.VALUE_DT.validateValue, x)
 
     @classmethod
     def validateBytes(cls, x):
-        checkInstance(x, (PY_BYTES, Buffer))
+        checkInstance(x, (PY_BYTES, ReadBuffer))
+
+    @classmethod
+    def packValues(cls, x):
+        try:
+            return struct.pack(f">{len(x)}{cls._val_format}", *x)
+        except struct.error:
+            # Re-run the per-element checks for a descriptive error
+            for val in x:
+                cls.VALUE_DT.validateValue(val)
+            raise
 
     @classmethod
     def toBytes(cls, x):
-        cls.validateValue(x)
-        values = list(map(lambda x: cls.VALUE_DT.toBytes(x), x))
-        return cls.LENGTH_DT.toBytes(len(x)) + b"".join(values)
+        if __debug__:
+            cls.validateValue(x)
+        if cls._val_format is not None:
+            return cls._len_to_bytes(len(x)) + cls.packValues(x)
+        enc = cls._val_to_bytes
+        out = bytearray(cls._len_to_bytes(len(x)))
+        for val in x:
+            out += enc(val)
+        return PY_BYTES(out)
+
+    @classmethod
+    def writeBytes(cls, x, out):
+        if __debug__:
+            cls.validateValue(x)
+        out.write(cls._len_to_bytes(len(x)))
+        if cls._val_format is not None:
+            out.write(cls.packValues(x))
+            return
+        enc = cls._val_write_bytes
+        for val in x:
+            enc(val, out)
 
     @classmethod
     def fromBytes(cls, x):
-        cls.validateBytes(x)
-        if not isinstance(x, Buffer):
-            x = Buffer(x)
-        length = cls.LENGTH_DT.fromBytes(x)
-        values = []
-        for _ in range(length):
-            values.append(cls.VALUE_DT.fromBytes(x))
-        return values
+        if not isinstance(x, ReadBuffer):
+            x = ReadBuffer(x)
+        length = cls._len_from_bytes(x)
+        if cls._val_format is not None:
+            packer = struct.Struct(f">{length}{cls._val_format}")
+            values = list(packer.unpack_from(x._mv, x._pos))
+            x._pos += packer.size
+            return values
+        dec = cls._val_from_bytes
+        return [dec(x) for _ in range(length)]
 
     @staticmethod
     def new(value_dt, length_dt=uint32):
@@ -215,6 +344,8 @@ class Struct:
     def __init__(self, dataTypes):
         self.validateDataTypes(dataTypes)
         self.dataTypes = dataTypes
+        self._n = len(dataTypes)
+        self._plan = self.compilePlan(dataTypes)
 
     @staticmethod
     def validateDataTypes(dataTypes):
@@ -222,23 +353,63 @@ class Struct:
         map(lambda x: checkInstance(x, type), dataTypes)
         map(lambda x: checkSubclass(x, DataType), dataTypes)
 
+    @staticmethod
+    def compilePlan(dataTypes):
+        # Runs of consecutive fixed-width Ints are merged into one
+        # struct.Struct so they are packed and unpacked with a single call.
+        plan = []
+        fmt = ""
+        start = 0
+        for i, dt in enumerate(dataTypes):
+            packer = getattr(dt, "_STRUCT", None)
+            if packer is not None:
+                if not fmt:
+                    start = i
+                fmt += packer.format[1:]
+                continue
+            if fmt:
+                plan.append((struct.Struct(">" + fmt), start, i))
+                fmt = ""
+            plan.append((dt, i, i + 1))
+        if fmt:
+            plan.append((struct.Struct(">" + fmt), start, len(dataTypes)))
+        return plan
+
     def validateValue(self, x):
-        assert len(x) == len(
-            self.dataTypes
-        ), f"Length of values({len(x)}) and length({len(self.dataTypes)}) of datatypes is not same"
+        if len(x) != self._n:
+            raise ValueError(
+                f"Length of values({len(x)}) and length({self._n}) of datatypes is not same"
+            )
 
     def toBytes(self, x):
-        self.validateValue(x)
-        b = b""
-        for dt, val in zip(self.dataTypes, x):
-            b += dt.toBytes(val)
-        return b
+        if __debug__:
+            self.validateValue(x)
+        out = WriteBuffer()
+        write = out.write
+        Packer = struct.Struct
+        for step, start, stop in self._plan:
+            if isinstance(step, Packer):
+                try:
+                    write(step.pack(*x[start:stop]))
+                except struct.error:
+                    # Re-run the per-field checks for a descriptive error
+                    for dt, val in zip(self.dataTypes[start:stop], x[start:stop]):
+                        dt.validateValue(val)
+                    raise
+            else:
+                step.writeBytes(x[start], out)
+        return out.getvalue()
 
     def fromBytes(self, x):
-        x = Buffer(x)
+        x = ReadBuffer(x)
         r = []
-        for dt in self.dataTypes:
-            r.append(dt.fromBytes(x))
+        Packer = struct.Struct
+        for step, start, stop in self._plan:
+            if isinstance(step, Packer):
+                r.extend(step.unpack_from(x._mv, x._pos))
+                x._pos += step.size
+            else:
+                r.append(step.fromBytes(x))
         return tuple(r)
 
 
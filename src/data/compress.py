@@ -1,24 +1,13 @@
 from bz2 import compress
-from collections import defaultdict
-import bytes as by
+from collections import Counter
+import struct
 from typing import Sized
 
 NULLB = b"\x00"
 
 
-def remove(s, begin, length):
-    return s[0:begin] + s[begin + length :]
-
-
-def insert(s1, s2, begin):
-    return s1[0:begin] + s2 + s1[begin:]
-
-
-def find(s1, s2, start):
-    return s1.find(s2, start)
-
-
-compressStruct = by.Struct([by.Sequence, by.Sequence])
+# Packets are the payload and the token string, each prefixed by its length
+LENGTH = struct.Struct(">I")
 
 
 class Compress:
@@ -27,63 +16,84 @@ class Compress:
     BUFFER_SIZE = 1000
 
     def __init__(self) -> None:
-        self.buffer = b""
+        self.buffer = bytearray()
         self.generateTable()
 
     def createTable(self, b):
-        occurrences = defaultdict(lambda: 0)
-        for i in range(0, len(b) - self.VALUE_SIZE + 1):
-            occurrences[b[i : i + self.VALUE_SIZE]] += 1
-        occurrences = list(occurrences.items())
-        occurrences.sort(key=lambda x: x[1], reverse=True)
-        occurrences = occurrences[:255]
+        # zip() over shifted copies yields every window as a tuple of ints
+        # without a Python-level loop; only the winners are turned into bytes.
+        windows = zip(*(b[k:] for k in range(self.VALUE_SIZE)))
+        occurrences = Counter(windows).most_common(255)
         t = {NULLB: NULLB}
         for i in range(1, len(occurrences)):
-            t[i.to_bytes(1, byteorder="big", signed=False)] = occurrences[i - 1][0]
+            t[i.to_bytes(1, byteorder="big", signed=False)] = bytes(occurrences[i - 1][0])
         return t
 
     def generateTable(self):
         self.table = self.createTable(self.buffer)
         self.tableInverted = {v: k for k, v in self.table.items()}
+        # Keys are single bytes, so decompress can index by the token's value
+        self.tableList = [None] * 256
+        for k, v in self.table.items():
+            self.tableList[k[0]] = v
         return self.table, self.tableInverted
 
     def addToBuffer(self, b):
-        self.buffer += b
-        self.buffer = self.buffer[: self.BUFFER_SIZE]
+        # Keep the most recent BUFFER_SIZE bytes so the table tracks new input
+        self.buffer += b[-self.BUFFER_SIZE :]
+        del self.buffer[: -self.BUFFER_SIZE]
 
     def compress(self, b):
         self.addToBuffer(b)
-        compressed = []
+        payload = bytearray()
+        compressed = bytearray()
         i = 0
-        while i + self.VALUE_SIZE < len(b):
-            bytes = b[i : i + self.VALUE_SIZE]
-            byte = b[i : i + 1]
-            # print(b, bytes, byte, len(b), i)
-            if bytes in self.tableInverted:
-                b = remove(b, i, self.VALUE_SIZE)
-                b = insert(b, NULLB, i)
-                compressed.append(self.tableInverted[bytes])
-            elif byte == NULLB:
-                compressed.append(self.tableInverted[byte])
-            i += self.KEY_SIZE
-        # return b, b"".join(compressed)
-        return compressStruct.toBytes([b, b"".join(compressed)])
+        # Literal bytes are copied in runs rather than one at a time
+        start = 0
+        NULL = NULLB
+        inv = self.tableInverted
+        nullKey = inv[NULL]
+        size = self.VALUE_SIZE
+        last = len(b) - size
+        while i <= last:
+            chunk = b[i : i + size]
+            key = inv.get(chunk)
+            if key is not None:
+                payload += b[start:i]
+                payload += NULL
+                compressed += key
+                i += size
+                start = i
+                continue
+            elif b[i] == 0:
+                compressed += nullKey
+            i += 1
+        payload += b[start:]
+        out = bytearray(LENGTH.pack(len(payload)))
+        out += payload
+        out += LENGTH.pack(len(compressed))
+        out += compressed
+        return bytes(out)
 
     def decompress(self, bStruct):
-        b, compressed = compressStruct.fromBytes(bStruct)
-        # print("DEC", b, compressed)
-        compressed = [
-            compressed[i : i + self.KEY_SIZE]
-            for i in range(0, len(compressed), self.KEY_SIZE)
-        ]
-        i = 0
-        while len(compressed) > 0:
-            val = self.table[compressed.pop(0)]
-            i = find(b, NULLB, i)
-            b = remove(b, i, 1)
-            b = insert(b, val, i)
-            i += len(val)
-            # print(i)
+        pos = LENGTH.size
+        end = pos + LENGTH.unpack_from(bStruct, 0)[0]
+        b = bStruct[pos:end]
+        pos = end + LENGTH.size
+        compressed = bStruct[pos : pos + LENGTH.unpack_from(bStruct, end)[0]]
+        out = bytearray()
+        pos = 0
+        table = self.tableList
+        NULL = NULLB
+        index = b.index
+        for token in compressed:
+            val = table[token]
+            nxt = index(NULL, pos)
+            out += b[pos:nxt]
+            out += val
+            pos = nxt + 1
+        out += b[pos:]
+        b = bytes(out)
         self.addToBuffer(b)
         return b
 